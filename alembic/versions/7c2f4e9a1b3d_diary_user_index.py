@@ -0,0 +1,60 @@
+"""diary search index on (collection_id, user_id)
+
+Revision ID: 7c2f4e9a1b3d
+Revises: 362456462a74
+Create Date: 2026-10-14 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c2f4e9a1b3d'
+down_revision: Union[str, Sequence[str], None] = '362456462a74'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # PGVector(langchain_postgres) 테이블이 아직 없으면 같은 스키마로 미리 생성
+    # (앱의 PGVector는 테이블이 있으면 그대로 사용하므로 인덱스를 마이그레이션에서 관리할 수 있음)
+    op.execute('CREATE EXTENSION IF NOT EXISTS vector')
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS langchain_pg_collection (
+            uuid UUID PRIMARY KEY,
+            name VARCHAR NOT NULL UNIQUE,
+            cmetadata JSON
+        )
+    """)
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS langchain_pg_embedding (
+            id VARCHAR PRIMARY KEY,
+            collection_id UUID REFERENCES langchain_pg_collection (uuid) ON DELETE CASCADE,
+            embedding VECTOR(1536),
+            document VARCHAR,
+            cmetadata JSONB
+        )
+    """)
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS ix_cmetadata_gin
+        ON langchain_pg_embedding USING gin (cmetadata jsonb_path_ops)
+    """)
+
+    # 사용자별 일기 검색용 인덱스 (user_id로 먼저 좁힌 뒤 벡터 거리 계산)
+    # 운영 중인 테이블에 쓰기 잠금을 걸지 않도록 CONCURRENTLY (트랜잭션 밖에서 실행)
+    with op.get_context().autocommit_block():
+        op.execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_langchain_pg_embedding_collection_user
+            ON langchain_pg_embedding (collection_id, (cmetadata->>'user_id'))
+        """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # PGVector 테이블은 앱 데이터(일기/매뉴얼)를 담고 있으므로 인덱스만 제거
+    with op.get_context().autocommit_block():
+        op.execute('DROP INDEX CONCURRENTLY IF EXISTS ix_langchain_pg_embedding_collection_user')
@@ -0,0 +1,63 @@
+"""fixed-dimension embedding column and HNSW cosine index
+
+Revision ID: 9e5a7b3c2d1f
+Revises: 7c2f4e9a1b3d
+Create Date: 2026-10-14 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e5a7b3c2d1f'
+down_revision: Union[str, Sequence[str], None] = '7c2f4e9a1b3d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+EMBEDDING_DIM = 1536  # text-embedding-3-small
+ITERATIVE_SCAN_MIN_VERSION = (0, 8)  # hnsw.iterative_scan 지원 pgvector 버전
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # 이전 버전 PGVector가 만든 테이블은 embedding 컬럼에 차원이 없어 HNSW 인덱스를 만들 수 없으므로
+    # vector(1536)으로 변환 (모든 행이 text-embedding-3-small 임베딩, 테이블 재작성 1회)
+    typmod = op.get_bind().execute(sa.text("""
+        SELECT atttypmod FROM pg_attribute
+        WHERE attrelid = 'langchain_pg_embedding'::regclass AND attname = 'embedding'
+    """)).scalar()
+    if typmod is not None and typmod < 0:
+        op.execute(f'ALTER TABLE langchain_pg_embedding ALTER COLUMN embedding TYPE vector({EMBEDDING_DIM})')
+
+    # 코사인 거리 HNSW 인덱스 (순차 스캔 대신 근사 최근접 검색)
+    # 컬렉션 uuid는 매뉴얼 재구축마다 바뀌므로 부분 인덱스가 아닌 테이블 전체 인덱스로 생성
+    # 테이블 전체 인덱스는 컬렉션 필터로 걸러진 후보를 iterative scan으로 보충해야 k개가 채워지므로,
+    # iterative scan이 없는 pgvector(0.8 미만)에서는 인덱스를 만들지 않고 정확한 순차 스캔 유지
+    extversion = op.get_bind().execute(
+        sa.text("SELECT extversion FROM pg_extension WHERE extname = 'vector'")
+    ).scalar()
+    version = tuple(int(part) for part in extversion.split('.')[:2])
+    if version < ITERATIVE_SCAN_MIN_VERSION:
+        print(
+            f"⚠️  pgvector {extversion}: hnsw.iterative_scan 미지원으로 HNSW 인덱스 생성 건너뜀 "
+            f"(0.8 이상으로 업그레이드 후 이 리비전을 다시 적용하세요)"
+        )
+        return
+
+    with op.get_context().autocommit_block():
+        # 이전 버전 앱이 런타임에 만든 매뉴얼 전용 부분 인덱스 정리
+        op.execute('DROP INDEX CONCURRENTLY IF EXISTS ix_langchain_pg_embedding_manual_hnsw')
+        op.execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_langchain_pg_embedding_embedding_hnsw
+            ON langchain_pg_embedding USING hnsw (embedding vector_cosine_ops)
+            WITH (m = 16, ef_construction = 64)
+        """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.execute('DROP INDEX CONCURRENTLY IF EXISTS ix_langchain_pg_embedding_embedding_hnsw')
@@ -5,11 +5,18 @@ from typing import Optional
 class Settings(BaseSettings):
     app_name: str = "FastAPI Application"
     debug: bool = True
+    log_level: str = "INFO"  # 앱 로그 레벨 (프로덕션은 WARNING 권장, DEBUG면 요약 버퍼 로그까지 출력)
     host: str = "0.0.0.0"
     port: int = 8000
     openai_api_key: Optional[str] = None
+    openai_timeout: float = 20.0  # OpenAI 요청 타임아웃 (초) - 응답 지연 시 워커 점유 방지
+    openai_max_retries: int = 2  # OpenAI 요청 재시도 횟수
     database_url: str  # 필수 환경변수
     redis_url: str = "redis://localhost:6379/0"  # Redis 연결 URL
+    llm_cache_enabled: bool = False  # PDF 매뉴얼 QA(temperature=0) 응답 Redis 캐시 사용 여부
+    llm_cache_ttl: int = 3600  # 매뉴얼 QA 응답 캐시 유지 시간 (초)
+    vector_search_workers: Optional[int] = None  # 벡터 검색 스레드 수 (미설정 시 이 프로세스가 쓸 수 있는 CPU 수)
+    frontend_origin: str = "*"  # CORS 허용 origin (여러 개면 쉼표로 구분)
 
     class Config:
         env_file = ".env"
@@ -1,9 +1,11 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
+import logging
 from app.routers import health, chatbot, auth, chat, admin, diary_view
 from app.database import engine, Base
 from app.models import db_models
+from app.config import get_settings
 
 
 @asynccontextmanager
@@ -17,13 +19,34 @@ async def lifespan(app: FastAPI):
     # 시작 시: PDF 매뉴얼 벡터 스토어 자동 로드
     print("📚 PDF 매뉴얼 벡터 스토어 로딩 중...")
     from app.services.vector_store import get_vector_store_service
+    vector_store = None
     try:
-        get_vector_store_service()  # 싱글톤 초기화 트리거
+        vector_store = get_vector_store_service()  # 싱글톤 초기화 트리거
         print("✅ PDF 매뉴얼 벡터 스토어 준비 완료!\n")
     except Exception as e:
         print(f"⚠️  PDF 매뉴얼 로드 실패: {e}")
         print("   /api/chatbot/initialize를 호출하여 수동으로 초기화하세요.\n")
 
+    # 시작 시: 첫 요청 지연 방지 워밍업 (토크나이저, 요청 스키마 검증기, 오케스트레이터)
+    print("🔥 워밍업 중...")
+    try:
+        from app.utils.tokenizer import get_tokenizer
+        from app.schemas.chatbot import QuestionRequest
+        from app.schemas.chat import ChatMessageRequest
+        from app.services.chat_orchestrator import get_chat_orchestrator
+
+        get_tokenizer()  # BPE 어휘 로드
+        QuestionRequest.model_validate({"question": "warm"})
+        ChatMessageRequest.model_validate({"session_id": "warm", "message": "warm"})
+
+        # 오케스트레이터는 벡터 스토어가 로드된 경우에만 미리 생성
+        # (None으로 생성되면 이후 요청에서도 매뉴얼 RAG 없이 고정되므로)
+        if vector_store is not None:
+            get_chat_orchestrator(vector_store=vector_store)
+        print("✅ 워밍업 완료!\n")
+    except Exception as e:
+        print(f"⚠️  워밍업 실패 (첫 요청에서 초기화됩니다): {e}\n")
+
     # 시작 시: 자동 일기 생성 스케줄러 시작
     print("⏰ 자동 일기 생성 스케줄러 시작 중...")
     from app.services.diary_scheduler import get_diary_scheduler
@@ -45,13 +68,22 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# 로그 레벨 설정 (logger.debug 호출은 레벨 확인만 하고 포맷팅/출력 생략)
+settings = get_settings()
+logging.basicConfig(
+    level=settings.log_level.upper(),
+    format="%(asctime)s %(levelname)s [%(name)s] %(message)s"
+)
+
 # CORS 설정
+# - 인증은 Authorization 헤더(Bearer)로만 하므로 쿠키 credentials 불필요
+# - max_age: preflight(OPTIONS) 결과를 브라우저가 캐시하여 요청마다 왕복하지 않도록 함
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],  # 프로덕션에서는 특정 도메인으로 제한
-    allow_credentials=True,
+    allow_origins=[origin.strip() for origin in settings.frontend_origin.split(",")],  # 프로덕션에서는 특정 도메인으로 제한
     allow_methods=["*"],
     allow_headers=["*"],
+    max_age=86400,
 )
 
 # 라우터 등록
@@ -1,4 +1,5 @@
 # app/repositories/user_repository.py
+from sqlalchemy import exists
 from sqlalchemy.orm import Session
 from app.models.db_models import User
 from typing import Optional
@@ -38,8 +39,8 @@ class UserRepository:
         self.db.commit()
 
     def exists_by_email(self, email: str) -> bool:
-        """이메일 존재 여부 확인"""
-        return self.db.query(User).filter(User.email == email).count() > 0
+        """이메일 존재 여부 확인 (COUNT 대신 EXISTS로 첫 행에서 중단)"""
+        return self.db.query(exists().where(User.email == email)).scalar()
 
     def get_all(self, skip: int = 0, limit: int = 100) -> list[User]:
         """모든 사용자 조회 (페이징)"""
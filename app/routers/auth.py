@@ -1,4 +1,5 @@
 # app/routers/auth.py
+import asyncio
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
@@ -14,7 +15,9 @@ async def register(user: UserCreate, db: Session = Depends(get_db)):
     """회원가입"""
     try:
         auth_service = AuthService(db)
-        result = auth_service.register(
+        # bcrypt 해싱은 CPU 작업이므로 이벤트 루프를 막지 않도록 스레드에서 실행
+        result = await asyncio.to_thread(
+            auth_service.register,
             email=user.email,
             password=user.password,
             nickname=user.nickname
@@ -32,7 +35,9 @@ async def login(user: UserLogin, db: Session = Depends(get_db)):
     """로그인"""
     try:
         auth_service = AuthService(db)
-        token = auth_service.login(
+        # bcrypt 검증은 CPU 작업이므로 이벤트 루프를 막지 않도록 스레드에서 실행
+        token = await asyncio.to_thread(
+            auth_service.login,
             email=user.email,
             password=user.password
         )
@@ -64,7 +69,6 @@ async def get_current_user_id(
     """현재 사용자 ID 가져오기 (Dependency)"""
     try:
         auth_service = AuthService(db)
-        user = auth_service.get_current_user(credentials.credentials)
-        return user["user_id"]
+        return auth_service.get_current_user_id(credentials.credentials)
     except ValueError as e:
         raise HTTPException(status_code=401, detail=str(e))
\ No newline at end of file
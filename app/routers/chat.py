@@ -1,5 +1,7 @@
 # routers/chat.py
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Header
+from fastapi.responses import StreamingResponse
+from typing import AsyncGenerator, AsyncIterator, Optional
 from app.schemas.chat import (
     SessionCreateRequest,
     SessionCreateResponse,
@@ -21,6 +23,21 @@ import traceback
 router = APIRouter(prefix="/api/chat", tags=["Chat"])
 
 
+async def _to_sse(stream: AsyncGenerator[str, None]) -> AsyncIterator[str]:
+    """
+    응답 텍스트 청크를 SSE(text/event-stream) 이벤트로 변환
+    - 청크 안의 줄바꿈은 data 줄로 나누어 전송 (클라이언트에서 줄바꿈으로 다시 합침)
+    - 응답이 끝나면 done 이벤트 전송
+    - 클라이언트 연결이 끊겨도 내부 스트림을 바로 닫아 대화 저장(finally)이 GC 시점과 무관하게 실행되도록 함
+    """
+    try:
+        async for chunk in stream:
+            yield "".join(f"data: {line}\n" for line in chunk.split("\n")) + "\n"
+        yield "event: done\ndata: \n\n"
+    finally:
+        await stream.aclose()
+
+
 @router.post("/session/create", response_model=SessionCreateResponse, summary="채팅 세션 시작")
 async def create_session(
     user_id: str = Depends(get_current_user_id),
@@ -64,11 +81,15 @@ async def create_session(
 async def send_message(
     request: ChatMessageRequest,
     user_id: str = Depends(get_current_user_id),
-    vector_store: VectorStoreService = Depends(get_vector_store_service)
+    vector_store: VectorStoreService = Depends(get_vector_store_service),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
 ):
     """
     채팅 메시지 전송
 
+    - Idempotency-Key 헤더(요청마다 새 값, 재전송 시 같은 값)를 보내면
+      같은 요청이 다시 와도 한 번만 처리하고 같은 응답을 반환
+
     **플로우:**
     1. 세션 검증
     2. 사용자 메시지 저장
@@ -92,9 +113,11 @@ async def send_message(
             raise HTTPException(status_code=403, detail="세션 접근 권한이 없습니다.")
 
         # 메시지 처리 (전체 플로우)
-        result = orchestrator.process_message(
+        result = await orchestrator.process_message(
             session_id=request.session_id,
-            user_message=request.message
+            user_message=request.message,
+            idempotency_key=idempotency_key,
+            session_info=session_info  # 검증에 사용한 세션 정보 재사용 (HGETALL 중복 방지)
         )
 
         return ChatMessageResponse(
@@ -115,6 +138,52 @@ async def send_message(
         raise HTTPException(status_code=500, detail=f"메시지 처리 실패: {str(e)}")
 
 
+@router.post("/message/stream", summary="메시지 전송 (스트리밍)")
+async def send_message_stream(
+    request: ChatMessageRequest,
+    user_id: str = Depends(get_current_user_id),
+    vector_store: VectorStoreService = Depends(get_vector_store_service)
+):
+    """
+    채팅 메시지 전송 (스트리밍 응답)
+
+    - 플로우는 /message와 동일
+    - 상담사 응답을 생성되는 대로 SSE(text/event-stream) data 이벤트로 전송, 완료 시 done 이벤트
+    - 응답 완료(또는 연결 종료) 후 대화 내역 저장
+    """
+    try:
+        # Orchestrator 생성 (vector_store 포함)
+        orchestrator = get_chat_orchestrator(vector_store=vector_store)
+
+        # 세션 검증 (user_id 확인)
+        session_info = orchestrator.session_manager.get_session_info(request.session_id)
+
+        if not session_info:
+            raise HTTPException(status_code=404, detail="세션을 찾을 수 없습니다.")
+
+        if session_info.get("user_id") != user_id:
+            raise HTTPException(status_code=403, detail="세션 접근 권한이 없습니다.")
+
+        # 컨텍스트 구성까지 완료 후 스트림 반환
+        stream = await orchestrator.aprocess_message(
+            session_id=request.session_id,
+            user_message=request.message,
+            session_info=session_info  # 검증에 사용한 세션 정보 재사용 (HGETALL 중복 방지)
+        )
+
+        return StreamingResponse(
+            _to_sse(stream),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}  # 프록시 버퍼링 방지
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"메시지 처리 실패: {e}\n{traceback.format_exc()}")
+        raise HTTPException(status_code=500, detail=f"메시지 처리 실패: {str(e)}")
+
+
 @router.post("/session/end", response_model=SessionEndResponse, summary="세션 종료 및 일기 생성")
 async def end_session(
     request: SessionEndRequest,
@@ -146,7 +215,7 @@ async def end_session(
             raise HTTPException(status_code=403, detail="세션 접근 권한이 없습니다.")
 
         # 대화 요약 → 일기 생성
-        diary_result = orchestrator.summarize_conversation_to_diary(request.session_id)
+        diary_result = await orchestrator.summarize_conversation_to_diary(request.session_id)
 
         if not diary_result or not diary_result.get("diary_text"):
             raise HTTPException(status_code=400, detail="대화 내용이 없어 일기를 생성할 수 없습니다.")
@@ -4,29 +4,43 @@ from app.schemas.chatbot import QuestionRequest, ChatResponse, StatusResponse
 from app.services.vector_store import (
     VectorStoreService,
     get_vector_store_service,
-    reset_vector_store_service
+    set_vector_store_service
 )
+from app.services.chat_session import get_session_manager
 from app.utils.pdf_loader import PDFProcessor
 from app.config import get_settings
-import os
+from pathlib import Path
+import json
 import traceback
 from app.routers.auth import get_current_user_id
 
 router = APIRouter()
 
+# PDF 매뉴얼 디렉토리 (프로젝트 루트의 data/, import 시 한 번만 계산)
+DATA_DIR = Path(__file__).resolve().parent.parent.parent / "data"
+PDF_STATE_REDIS_KEY = "chatbot:pdf_state"  # 마지막으로 임베딩한 PDF 상태
+
+
+def _get_pdf_state() -> str:
+    """data 디렉토리 상태 (디렉토리 mtime + PDF 파일명/크기) 문자열"""
+    pdf_files = sorted((path.name, path.stat().st_size) for path in DATA_DIR.glob("*.pdf"))
+    return json.dumps([DATA_DIR.stat().st_mtime_ns, pdf_files], ensure_ascii=False)
+
 
 # ============================================
 # API 엔드포인트
 # ============================================
 
 @router.post("/initialize", response_model=StatusResponse, summary="PDF 매뉴얼 재초기화")
-async def initialize_chatbot():
+async def initialize_chatbot(force: bool = False):
     """
     PDF 매뉴얼 재초기화 API (관리자용)
 
     - data 폴더의 모든 PDF 문서 로드
     - 기존 벡터 DB 삭제 후 재생성
     - QA 체인 구축
+    - 마지막 초기화 이후 PDF가 바뀌지 않았으면 재임베딩 없이 기존 벡터 스토어 유지
+      (force=true면 항상 재생성)
 
     **주의:** 일반적으로는 서버 시작 시 자동 로드되므로 이 API는 불필요합니다.
     PDF 파일이 추가/변경되었을 때만 호출하세요.
@@ -48,33 +62,56 @@ async def initialize_chatbot():
             )
 
         # 2. data 디렉토리 확인
-        data_dir = os.path.join(os.getcwd(), "data")
-
-        if not os.path.exists(data_dir):
+        if not DATA_DIR.exists():
             raise HTTPException(
                 status_code=404,
-                detail=f"data 디렉토리를 찾을 수 없습니다: {data_dir}"
+                detail=f"data 디렉토리를 찾을 수 없습니다: {DATA_DIR}"
             )
 
-        # 3. 기존 싱글톤 인스턴스 리셋
-        reset_vector_store_service()
-
-        # 4. 새 벡터 스토어 서비스 생성
+        # PDF가 마지막 초기화 이후 그대로면 재임베딩 생략
+        pdf_state = _get_pdf_state()
+        redis_client = get_session_manager().redis
+        if not force:
+            try:
+                last_state = redis_client.get(PDF_STATE_REDIS_KEY)
+            except Exception as e:
+                print(f"PDF 상태 조회 실패 (재초기화 진행): {e}")
+                last_state = None
+
+            if last_state == pdf_state:
+                current = get_vector_store_service()
+                if current.qa_chain is not None:
+                    return StatusResponse(
+                        success=True,
+                        message="PDF 매뉴얼 변경 사항이 없어 기존 벡터 스토어를 유지합니다.",
+                        data={
+                            "status": "unchanged",
+                            "initialized": True,
+                            "loaded_files": sorted(path.name for path in DATA_DIR.glob("*.pdf"))
+                        }
+                    )
+
+        # 3. 새 벡터 스토어 서비스 생성 (교체 전까지 기존 인스턴스가 계속 응답)
         vector_store = VectorStoreService(
             openai_api_key=settings.openai_api_key,
             database_url=settings.database_url
         )
 
-        # 5. PDF 로드 및 벡터 DB 재생성
-        pdf_processor = PDFProcessor(data_dir=data_dir)
+        # 4. PDF 로드 및 벡터 DB 재생성
+        pdf_processor = PDFProcessor(data_dir=str(DATA_DIR))
         documents, loaded_files = pdf_processor.load_and_split()
 
-        vector_store.create_vectorstore(documents)
+        await vector_store.create_vectorstore(documents)
         vector_store.create_qa_chain()
 
-        # 6. 싱글톤 인스턴스에 등록
-        from app.services import vector_store as vs_module
-        vs_module._vector_store_instance = vector_store
+        # 5. 싱글톤 인스턴스 교체 (이전 인스턴스의 커넥션 정리)
+        set_vector_store_service(vector_store)
+
+        # 6. 처리한 PDF 상태 기록 (다음 호출에서 변경 여부 비교)
+        try:
+            redis_client.set(PDF_STATE_REDIS_KEY, pdf_state)
+        except Exception as e:
+            print(f"PDF 상태 저장 실패: {e}")
 
         return StatusResponse(
             success=True,
@@ -1,6 +1,9 @@
 # app/services/auth_service.py
 from datetime import datetime, timedelta, timezone
+import hashlib
 import re
+import threading
+from cachetools import TTLCache
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from sqlalchemy.orm import Session
@@ -13,8 +16,41 @@ SECRET_KEY = "your-secret-key-change-in-production"  # 환경변수로 관리
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30 * 24 * 60  # 30일
 EMAIL_REGEX = r"^[\w\.-]+@[\w\.-]+\.\w+$"
+REQUIRED_CLAIMS = ("user_id", "email")  # 토큰 페이로드 필수 클레임
+BCRYPT_MAX_BYTES = 72  # bcrypt 입력 길이 제한
+
+# cost 10: 기본값(12) 대비 약 4배 빠름. 기존 cost 12 해시도 그대로 검증됨
+pwd_context = CryptContext(schemes=["bcrypt"], bcrypt__rounds=10, deprecated="auto")
+
+# 인증 캐시 (요청마다 JWT 검증 + DB 조회 반복 방지)
+# FastAPI는 동기 작업을 스레드풀에서 실행하므로 Lock으로 보호
+_token_cache = TTLCache(maxsize=10_000, ttl=30)  # sha256(token) -> payload
+_user_cache = TTLCache(maxsize=5_000, ttl=60)  # email -> 사용자 정보
+_user_id_cache = TTLCache(maxsize=10_000, ttl=30)  # sha256(token) -> (user_id, exp)
+_cache_lock = threading.Lock()
+
+
+def _token_key(token: str) -> bytes:
+    """토큰 캐시 키 (원문 토큰을 메모리에 보관하지 않도록 해시 사용)"""
+    return hashlib.sha256(token.encode()).digest()[:16]
+
+
+def _truncate_password(password: str) -> bytes:
+    """
+    bcrypt 72바이트 제한에 맞춰 UTF-8 문자 경계에서 자르기
+
+    잘린 멀티바이트 문자는 버리므로 기존 decode(errors='ignore') 방식과 같은 바이트열을 만든다.
+    """
+    password_bytes = password.encode('utf-8')
+    if len(password_bytes) <= BCRYPT_MAX_BYTES:
+        return password_bytes
+
+    end = BCRYPT_MAX_BYTES
+    # 경계에 걸친 문자의 연속 바이트(0b10xxxxxx)면 문자 시작 위치까지 후퇴
+    while end > 0 and (password_bytes[end] & 0xC0) == 0x80:
+        end -= 1
+    return password_bytes[:end]
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 class AuthService:
     def __init__(self, db: Session = None):
@@ -23,15 +59,12 @@ class AuthService:
     
     def hash_password(self, password: str) -> str:
         """비밀번호 해싱 (bcrypt 72바이트 제한 대응)"""
-        # bcrypt는 72바이트까지만 처리 가능
-        password_bytes = password.encode('utf-8')[:72]
-        return pwd_context.hash(password_bytes.decode('utf-8', errors='ignore'))
+        return pwd_context.hash(_truncate_password(password))
     
     def verify_password(self, plain_password: str, hashed_password: str) -> bool:
         """비밀번호 검증 (bcrypt 72바이트 제한 대응)"""
         # 해싱할 때와 동일하게 72바이트로 자르기
-        password_bytes = plain_password.encode('utf-8')[:72]
-        return pwd_context.verify(password_bytes.decode('utf-8', errors='ignore'), hashed_password)
+        return pwd_context.verify(_truncate_password(plain_password), hashed_password)
     
     def create_access_token(self, data: dict) -> str:
         """JWT 토큰 생성"""
@@ -42,12 +75,35 @@ class AuthService:
         return encoded_jwt
     
     def verify_token(self, token: str) -> dict:
-        """JWT 토큰 검증"""
+        """JWT 토큰 검증 (검증 결과 캐시)"""
+        key = _token_key(token)
+        with _cache_lock:
+            payload = _token_cache.get(key)
+
+        if payload is not None:
+            # 캐시 TTL 중에 만료된 토큰은 다시 검증하도록 함
+            if payload.get("exp", 0) > datetime.now(timezone.utc).timestamp():
+                return payload
+            with _cache_lock:
+                _token_cache.pop(key, None)
+
         try:
-            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-            return payload
+            # 서명/만료 검증과 필수 클레임 확인을 한 번의 디코드로 처리
+            payload = jwt.decode(
+                token,
+                SECRET_KEY,
+                algorithms=[ALGORITHM],
+                options={"require_exp": True}
+            )
         except JWTError:
             return None
+
+        if any(not payload.get(claim) for claim in REQUIRED_CLAIMS):
+            return None
+
+        with _cache_lock:
+            _token_cache[key] = payload
+        return payload
     
     def register(self, email: str, password: str, nickname: str) -> dict:
         """회원가입"""
@@ -69,6 +125,10 @@ class AuthService:
 
         created_user = self.user_repository.create(new_user)
 
+        # 가입 전 조회로 남아있을 수 있는 캐시 무효화
+        with _cache_lock:
+            _user_cache.pop(email, None)
+
         return {
             "user_id": str(created_user.user_id),
             "email": created_user.email,
@@ -98,19 +158,58 @@ class AuthService:
         return access_token
     
     def get_current_user(self, token: str) -> dict:
-        """현재 사용자 정보 가져오기"""
+        """
+        현재 사용자 정보 가져오기
+
+        모든 인증 요청(/chat 포함)이 거치는 경로이므로 HMAC(HS256) 토큰 검증과 캐시 조회만 수행한다.
+        bcrypt(pwd_context)는 register/login에서만 사용하고 여기서는 절대 호출하지 않는다.
+        """
         payload = self.verify_token(token)
         if not payload:
             raise ValueError("유효하지 않은 토큰입니다")
 
         email = payload.get("email")
+        with _cache_lock:
+            cached_user = _user_cache.get(email)
+        if cached_user is not None:
+            return dict(cached_user)
+
         user = self.user_repository.find_by_email(email)
 
         if not user:
             raise ValueError("사용자를 찾을 수 없습니다")
 
-        return {
+        user_info = {
             "user_id": str(user.user_id),
             "email": user.email,
             "nickname": user.nickname
-        }
\ No newline at end of file
+        }
+
+        with _cache_lock:
+            _user_cache[email] = user_info
+        return dict(user_info)
+
+    def get_current_user_id(self, token: str) -> str:
+        """
+        현재 사용자 ID 가져오기 (인증 Dependency 전용)
+
+        토큰 해시로 user_id를 바로 찾아 JWT 검증/사용자 조회를 모두 건너뛴다.
+        """
+        key = _token_key(token)
+        with _cache_lock:
+            cached = _user_id_cache.get(key)
+
+        if cached is not None:
+            user_id, exp = cached
+            if exp > datetime.now(timezone.utc).timestamp():
+                return user_id
+            with _cache_lock:
+                _user_id_cache.pop(key, None)
+
+        user = self.get_current_user(token)
+        payload = self.verify_token(token)  # 직전 호출로 캐시되어 있음
+
+        if payload:
+            with _cache_lock:
+                _user_id_cache[key] = (user["user_id"], payload["exp"])
+        return user["user_id"]
@@ -1,21 +1,104 @@
 # services/chat_orchestrator.py
-from typing import List, Dict, Optional
+from typing import AsyncIterator, List, Dict, Optional, Tuple
+from functools import lru_cache
+import asyncio
+import hashlib
 import json
+import logging
 import re
+import orjson
 from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
 from app.services.chat_session import ChatSessionManager
-from app.services.diary_service import DiaryService
+from app.services.diary_service import DiaryService, DIARY_SNIPPET_LENGTH
 from app.services.vector_store import VectorStoreService
 from app.config import get_settings
 from app.prompts.system import COUNSELOR_SYSTEM_PROMPT
-import tiktoken
+from app.utils.executors import run_vector_search
+from app.utils.tokenizer import get_tokenizer
+
+logger = logging.getLogger(__name__)
 
 # 대화 요약 버퍼 설정 (ConversationSummaryBufferMemory 로직 수동 구현)
 MAX_TOKEN_LIMIT = 2000  # 최근 대화가 이 토큰 수를 초과하면 오래된 메시지 요약
 SUMMARY_REDIS_KEY = "conversation_summary"  # Redis에 저장할 요약 키
+SUMMARY_REFRESH_BATCH = 8  # 요약 이후 밀려난 메시지가 이만큼 쌓여야 요약을 갱신
+
+# LLM 출력 토큰 상한 (응답이 길어져 워커를 오래 점유하지 않도록)
+CHAT_MAX_TOKENS = 512  # 상담 응답 / 대화 요약
+CBT_EXTRACT_MAX_TOKENS = 512  # CBT 4요소 JSON (한국어 JSON이 잘리지 않도록 여유 있게)
+PERSPECTIVE_MAX_TOKENS = 256  # 다른 관점 (1~2문장)
+DIARY_MAX_TOKENS = 800  # 하루 일기
+
+# 재전송 요청(더블 클릭/새로고침, Idempotency-Key 기준) 응답 캐시
+ANSWER_CACHE_TTL = 60  # 처리한 요청의 응답 유지 시간 (초)
+ANSWER_LOCK_POLL_INTERVAL = 0.2  # 처리 중인 요청 완료 대기 간격 (초)
+ANSWER_LOCK_MARGIN = 10  # 처리 중 표시 유지 시간 여유 (초)
+TURN_MAX_OPENAI_CALLS = 4  # 한 턴의 OpenAI 호출 수 상한 (임베딩, 대화 요약, 매뉴얼 QA, 상담 응답)
+
+# Redis 메시지 role → LangChain 메시지 클래스 (알 수 없는 role은 변환 시 제외)
+_ROLE_MAP = {"user": HumanMessage, "assistant": AIMessage}
+
+# 추가 컨텍스트가 없는 턴에서 그대로 재사용할 시스템 메시지 (프로세스 전역 공유)
+_SYSTEM_PROMPT_MSG = SystemMessage(content=COUNSELOR_SYSTEM_PROMPT)
+
+# LLM 응답에서 JSON 블록({ ... })을 찾는 정규식 (모듈 로드 시 1회 컴파일)
+_JSON_BLOCK_RE = re.compile(r"\{.*\}", re.DOTALL)
+
+# 토큰 카운터 - 세션 관리자와 같은 인코더 공유
+_TOKENIZER = get_tokenizer()
+
+
+def _format_transcript(messages: List[Dict], separator: str = "\n\n") -> str:
+    """메시지 리스트를 '사용자: ... / 상담사: ...' 대화 텍스트로 변환 (한 번의 join으로 생성)"""
+    return separator.join(
+        f"{'사용자' if msg['role'] == 'user' else '상담사'}: {msg['content']}"
+        for msg in messages
+    )
+
+
+def _answer_cache_key(session_id: str, idempotency_key: str, user_message: str) -> str:
+    """세션(=사용자) + 요청 식별자 기준 응답 캐시 키 (같은 키를 다른 메시지에 재사용해도 섞이지 않도록 메시지 해시 포함)"""
+    digest = hashlib.blake2b(
+        f"{idempotency_key}\n{user_message}".encode("utf-8"), digest_size=16
+    ).hexdigest()
+    return f"chatans:{session_id}:{digest}"
+
+
+def _answer_lock_ttl() -> int:
+    """처리 중 표시 유지 시간 (한 턴이 타임아웃/재시도까지 포함해 걸릴 수 있는 최대 시간보다 길게)"""
+    settings = get_settings()
+    per_call = settings.openai_timeout * (settings.openai_max_retries + 1)
+    return int(per_call * TURN_MAX_OPENAI_CALLS) + ANSWER_LOCK_MARGIN
+
+
+@lru_cache()
+def _get_chat_llm() -> ChatOpenAI:
+    """상담 응답/요약용 LLM (프로세스 전역 싱글톤, HTTP 클라이언트 재사용)"""
+    settings = get_settings()
+    return ChatOpenAI(
+        model="gpt-4o-mini",
+        temperature=0.7,  # 공감적인 응답을 위해 조금 높게
+        api_key=settings.openai_api_key,
+        timeout=settings.openai_timeout,
+        max_retries=settings.openai_max_retries,
+        max_tokens=CHAT_MAX_TOKENS
+    )
+
+
+@lru_cache()
+def _get_mini_llm() -> ChatOpenAI:
+    """일기 생성 체인용 LLM (프로세스 전역 싱글톤, 출력 토큰 상한은 체인별로 지정)"""
+    settings = get_settings()
+    return ChatOpenAI(
+        model="gpt-4o-mini",
+        api_key=settings.openai_api_key,
+        timeout=settings.openai_timeout,
+        max_retries=settings.openai_max_retries
+    )
+
 
 class ChatOrchestrator:
     """
@@ -37,22 +120,16 @@ class ChatOrchestrator:
         self.diary_service = diary_service
         self.vector_store = vector_store  # PDF 매뉴얼 RAG
 
-        settings = get_settings()
-        self.llm = ChatOpenAI(
-            model="gpt-4o-mini",
-            temperature=0.7  # 공감적인 응답을 위해 조금 높게
-        )
+        # LLM/토큰 카운터는 모듈 전역 인스턴스 공유 (오케스트레이터를 새로 만들어도 재생성하지 않음)
+        self.llm = _get_chat_llm()
         # --- [주석] main_with_redis.py의 gpt-4o-mini 모델 설정을 가져옴 ---
-        self.llm_mini = ChatOpenAI(
-            model="gpt-4o-mini",
-            api_key=settings.openai_api_key
-        )
+        self.llm_mini = _get_mini_llm()
         # --- [주석] ---
 
-        # 토큰 카운터 (gpt-4o-mini는 cl100k_base 인코딩 사용)
-        self.tokenizer = tiktoken.get_encoding("cl100k_base")
+        self.tokenizer = _TOKENIZER
 
         self.system_prompt = COUNSELOR_SYSTEM_PROMPT
+        self._system_prompt_msg = _SYSTEM_PROMPT_MSG
 
         # --- [주석] main_with_redis.py의 프롬프트 및 체인 설정 ---
         # 1. 프롬프트 템플릿 정의
@@ -103,18 +180,32 @@ class ChatOrchestrator:
         # 2. 파서 및 LangChain 체인 구성
         string_parser = StrOutputParser()
 
-        self.chain_extract_cbt = self.cbt_extract_prompt | self.llm_mini | string_parser
-        self.chain_gen_perspective = self.alt_perspective_prompt | self.llm_mini | string_parser
-        self.chain_create_diary = self.diary_generation_prompt | self.llm_mini | string_parser
+        self.chain_extract_cbt = (
+            self.cbt_extract_prompt
+            | self.llm_mini.bind(max_tokens=CBT_EXTRACT_MAX_TOKENS)
+            | string_parser
+        )
+        self.chain_gen_perspective = (
+            self.alt_perspective_prompt
+            | self.llm_mini.bind(max_tokens=PERSPECTIVE_MAX_TOKENS)
+            | string_parser
+        )
+        self.chain_create_diary = (
+            self.diary_generation_prompt
+            | self.llm_mini.bind(max_tokens=DIARY_MAX_TOKENS)
+            | string_parser
+        )
         # --- [주석] ---
 
     # ------------------------
     # 외부에서 호출하는 메인 엔드포인트
     # ------------------------
-    def process_message(
+    async def process_message(
         self,
         session_id: str,
-        user_message: str
+        user_message: str,
+        idempotency_key: Optional[str] = None,
+        session_info: Optional[Dict] = None
     ) -> Dict:
         """
         사용자 메시지 처리 (전체 플로우)
@@ -123,42 +214,136 @@ class ChatOrchestrator:
         - Redis: 전체 대화 영속화 스토리지
         - 대화 요약 버퍼: 오래된 메시지 자동 요약, 최근 메시지 원본 유지
 
+        대화 내역 로드/요약과 RAG 검색은 서로 독립적이므로 동시에 실행한다.
+
         Args:
             session_id: 세션 ID
             user_message: 사용자 메시지
+            idempotency_key: 클라이언트가 요청마다 만든 식별자 (재전송 시 같은 값)
+                - 있으면 같은 요청의 재전송(더블 클릭/새로고침)은 다시 처리하지 않고 저장된 응답 반환
+                - 없으면 항상 새로 처리 (같은 말을 연달아 보내도 각각 응답)
+            session_info: 호출자가 이미 조회한 세션 정보 (있으면 HGETALL 생략)
 
         Returns:
             응답 데이터 (answer, sources)
         """
-        # 1. 세션 존재 확인
-        if not self.session_manager.session_exists(session_id):
-            raise ValueError("유효하지 않은 세션입니다")
-
-        # 2. 세션 정보 조회 (user_id 가져오기)
-        session_info = self.session_manager.get_session_info(session_id)
-        user_id = session_info.get("user_id")
+        if not idempotency_key:
+            return await self._run_turn(session_id, user_message, session_info)
+
+        redis_client = self.session_manager.redis
+        cache_key = _answer_cache_key(session_id, idempotency_key, user_message)
+        lock_key = f"{cache_key}:lock"
+        lock_ttl = _answer_lock_ttl()
+
+        # 0. 이미 처리한 요청의 재전송이면 저장된 응답 재사용 (RAG + LLM 호출 생략)
+        cached = await self._get_cached_answer(cache_key)
+        if cached is not None:
+            return cached
+
+        locked = bool(await asyncio.to_thread(redis_client.set, lock_key, "1", nx=True, ex=lock_ttl))
+        if not locked:
+            # 같은 요청을 처리 중이면 끝날 때까지 기다렸다가 그 응답 사용 (실패했으면 직접 처리)
+            cached = await self._wait_for_cached_answer(cache_key, lock_key, lock_ttl)
+            if cached is not None:
+                return cached
 
-        # 3. Redis에서 기존 대화 내역 전체 로드
-        full_conversation = self.session_manager.get_full_conversation(session_id)
+        try:
+            result = await self._run_turn(session_id, user_message, session_info)
+            await asyncio.to_thread(redis_client.setex, cache_key, ANSWER_CACHE_TTL, orjson.dumps(result))
+            return result
+        finally:
+            if locked:
+                await asyncio.to_thread(redis_client.delete, lock_key)
+
+    async def _run_turn(
+        self,
+        session_id: str,
+        user_message: str,
+        session_info: Optional[Dict] = None
+    ) -> Dict:
+        """컨텍스트 구성 → 모델 호출 → 대화 저장 (한 턴)"""
+        context, similar_diaries = await self._prepare_turn(session_id, user_message, session_info)
 
-        # 4. 대화 요약 버퍼 로직 적용
-        buffered_messages = self._apply_summary_buffer_memory(session_id, full_conversation)
+        # 모델 호출
+        assistant_response = await self._generate_response(context)
 
-        # 5. 과거 일기 검색 (RAG)
-        similar_diaries = self.diary_service.search_similar_diaries(
-            user_id=user_id, query=user_message, k=3
+        # Redis에 저장 (영속화, 사용자 메시지 + 응답을 파이프라인으로 1회 전송)
+        await asyncio.to_thread(
+            self.session_manager.add_messages,
+            session_id,
+            [("user", user_message), ("assistant", assistant_response)]
         )
 
-        # 6. PDF 매뉴얼 검색 (RAG)
-        manual_context = None
-        if self.vector_store:
-            try:
-                manual_result = self.vector_store.query(user_message)
-                manual_context = manual_result.get("answer", "")
-            except Exception as e:
-                print(f"매뉴얼 검색 실패: {e}")
+        return {
+            "answer": assistant_response,
+            "similar_diaries": [d["metadata"].get("created_at") for d in similar_diaries] if similar_diaries else None
+        }
 
-        # 7. 컨텍스트 구성 (시스템 프롬프트 + RAG + 버퍼된 대화)
+    async def _get_cached_answer(self, cache_key: str) -> Optional[Dict]:
+        """같은 요청으로 저장된 응답 조회 (없으면 None)"""
+        raw = await asyncio.to_thread(self.session_manager.redis.get, cache_key)
+        return orjson.loads(raw) if raw else None
+
+    async def _wait_for_cached_answer(self, cache_key: str, lock_key: str, lock_ttl: int) -> Optional[Dict]:
+        """처리 중인 같은 요청이 끝날 때까지 대기 후 그 응답 반환 (실패했으면 None)"""
+        redis_client = self.session_manager.redis
+        waited = 0.0
+        while waited < lock_ttl and await asyncio.to_thread(redis_client.exists, lock_key):
+            await asyncio.sleep(ANSWER_LOCK_POLL_INTERVAL)
+            waited += ANSWER_LOCK_POLL_INTERVAL
+        return await self._get_cached_answer(cache_key)
+
+    async def aprocess_message(
+        self,
+        session_id: str,
+        user_message: str,
+        session_info: Optional[Dict] = None
+    ) -> AsyncIterator[str]:
+        """
+        사용자 메시지 처리 (스트리밍)
+
+        컨텍스트 구성까지는 즉시 수행하여 세션 오류 등을 응답 시작 전에 발생시키고,
+        LLM 응답은 토큰 단위로 흘려보내는 async iterator를 반환한다.
+        생성이 끝나면 사용자 메시지 + 전체 응답을 Redis에 저장한다.
+
+        Args:
+            session_id: 세션 ID
+            user_message: 사용자 메시지
+            session_info: 호출자가 이미 조회한 세션 정보 (있으면 HGETALL 생략)
+
+        Returns:
+            응답 텍스트 조각을 yield하는 async iterator
+        """
+        context, _ = await self._prepare_turn(session_id, user_message, session_info)
+        return self._stream_response(session_id, user_message, context)
+
+    async def _prepare_turn(
+        self,
+        session_id: str,
+        user_message: str,
+        session_info: Optional[Dict] = None
+    ) -> Tuple[List, List[Dict]]:
+        """
+        모델 호출 직전까지의 플로우 (세션 확인 → 대화 버퍼 + RAG → 컨텍스트 구성)
+
+        Returns:
+            (LLM 입력 메시지 리스트, 유사 일기 리스트)
+        """
+        # 1. 세션 확인 + 세션 정보 조회 (HGETALL 1회로 user_id와 요약 캐시까지 가져옴)
+        # 라우터에서 세션 검증 시 이미 조회했으면 그대로 사용
+        if session_info is None:
+            session_info = self.session_manager.get_session_info(session_id)
+        if not session_info:
+            raise ValueError("유효하지 않은 세션입니다")
+        user_id = session_info.get("user_id")
+
+        # 2. 대화 요약 버퍼 구성 + RAG 검색 (동시 실행)
+        buffered_messages, (similar_diaries, manual_context) = await asyncio.gather(
+            self._load_buffered_messages(session_id, session_info),
+            self._retrieve_context(user_id, user_message)
+        )
+
+        # 3. 컨텍스트 구성 (시스템 프롬프트 + RAG + 버퍼된 대화)
         context = self._build_context_with_memory(
             similar_diaries=similar_diaries,
             buffered_messages=buffered_messages,
@@ -166,30 +351,74 @@ class ChatOrchestrator:
             manual_context=manual_context
         )
 
-        # 8. 모델 호출
-        assistant_response = self._generate_response(context)
+        return context, similar_diaries
 
-        # 9. Redis에 저장 (영속화)
-        self.session_manager.add_message(session_id, "user", user_message)
-        self.session_manager.add_message(session_id, "assistant", assistant_response)
+    async def _load_buffered_messages(self, session_id: str, session_info: Optional[Dict] = None) -> List:
+        """Redis에서 전체 대화 로드 후 대화 요약 버퍼 로직 적용"""
+        full_conversation = await asyncio.to_thread(
+            self.session_manager.get_full_conversation, session_id
+        )
+        return await self._apply_summary_buffer_memory(session_id, full_conversation, session_info)
 
-        return {
-            "answer": assistant_response,
-            "similar_diaries": [d["metadata"].get("created_at") for d in similar_diaries] if similar_diaries else None
-        }
+    async def _retrieve_context(
+        self,
+        user_id: str,
+        user_message: str
+    ) -> Tuple[List[Dict], Optional[str]]:
+        """
+        과거 일기 검색 + PDF 매뉴얼 검색 (RAG, 동시 실행)
 
-    def _apply_summary_buffer_memory(
+        Returns:
+            (유사 일기 리스트, 매뉴얼 컨텍스트)
+        """
+        # 사용자 메시지 임베딩 (일기/매뉴얼 검색에서 공유, API 호출 1회)
+        query_vector = None
+        try:
+            [query_vector] = await self.diary_service.aembed_batch([user_message])
+        except Exception as e:
+            logger.warning("메시지 임베딩 실패 (각 검색에서 개별 임베딩): %s", e)
+
+        similar_diaries, manual_context = await asyncio.gather(
+            run_vector_search(
+                self.diary_service.search_similar_diaries,
+                user_id=user_id, query=user_message, k=3, query_vector=query_vector
+            ),
+            self._query_manual(user_message, query_vector)
+        )
+        return similar_diaries, manual_context
+
+    async def _query_manual(
+        self,
+        user_message: str,
+        query_vector: Optional[List[float]] = None
+    ) -> Optional[str]:
+        """PDF 매뉴얼 검색 (RAG) - 실패 시 None"""
+        if not self.vector_store:
+            return None
+        try:
+            # 상담 컨텍스트에는 답변만 사용하므로 참조 문서 본문은 받지 않음
+            manual_result = await self.vector_store.aquery(
+                user_message, query_vector=query_vector, return_sources=False
+            )
+            return manual_result.get("answer", "")
+        except Exception as e:
+            logger.warning("매뉴얼 검색 실패: %s", e)
+            return None
+
+    async def _apply_summary_buffer_memory(
         self,
         session_id: str,
-        full_conversation: List[Dict]
+        full_conversation: List[Dict],
+        session_info: Optional[Dict] = None
     ) -> List:
         """
         대화 요약 버퍼 로직 적용
 
         **동작 원리:**
-        1. 최근 메시지들의 토큰 수 계산
+        1. 최근 메시지들의 토큰 수 합산 (메시지별 토큰 수는 Redis 저장 시 계산됨)
         2. MAX_TOKEN_LIMIT 초과 시:
            - 오래된 메시지들을 LLM으로 요약
+           - 기존 요약이 있으면 새로 밀려난 메시지만 반영하여 확장
            - 요약을 Redis에 캐시 (중복 요약 방지)
            - 요약 + 최근 원본 메시지 반환
         3. 미만이면 전체 원본 메시지 반환
@@ -200,65 +429,111 @@ class ChatOrchestrator:
         if not full_conversation:
             return []
 
-        # 1. 최근 메시지부터 역순으로 토큰 누적 계산
-        recent_messages = []
+        # 0. 세션에 누적된 전체 토큰 수가 한도 이하이면 요약 로직 없이 전체 원본 반환
+        # (create_session에서 0부터 누적을 시작한 세션만 신뢰, 그 외에는 메시지별 토큰 수로 계산)
+        if (
+            session_info
+            and session_info.get("tokens_tracked")
+            and session_info.get("total_tokens") is not None
+            and int(session_info["total_tokens"]) <= MAX_TOKEN_LIMIT
+        ):
+            return self._convert_to_langchain_messages(full_conversation)
+
+        # 1. 메시지별 토큰 수 준비
+        # 저장 시 계산된 토큰 수 사용, 이전 형식 메시지만 encode_ordinary_batch로 한 번에 인코딩
+        token_counts = [msg.get("tokens") for msg in full_conversation]
+        missing = [i for i, count in enumerate(token_counts) if count is None]
+        if missing:
+            encoded = _TOKENIZER.encode_ordinary_batch(
+                [full_conversation[i]["content"] for i in missing], num_threads=4
+            )
+            for i, tokens in zip(missing, encoded):
+                token_counts[i] = len(tokens)
+
+        # 2. 최근 메시지부터 역순으로 토큰 누적 → 최근/오래된 메시지 경계(cut) 계산
         recent_token_count = 0
+        cut = len(full_conversation)
 
-        for msg in reversed(full_conversation):
-            msg_tokens = len(self.tokenizer.encode(msg["content"]))
+        for i in range(len(full_conversation) - 1, -1, -1):
+            msg_tokens = token_counts[i]
 
-            if recent_token_count + msg_tokens <= MAX_TOKEN_LIMIT:
-                recent_messages.insert(0, msg)  # 앞에 삽입 (원래 순서 유지)
-                recent_token_count += msg_tokens
-            else:
+            if recent_token_count + msg_tokens > MAX_TOKEN_LIMIT:
                 break  # 토큰 한계 초과
+            recent_token_count += msg_tokens
+            cut = i
 
-        # 2. 요약이 필요한지 확인
-        old_messages = full_conversation[:len(full_conversation) - len(recent_messages)]
+        # 3. 요약이 필요한지 확인 (경계 기준으로 한 번에 분할)
+        recent_messages = full_conversation[cut:]
+        old_messages = full_conversation[:cut]
 
         if not old_messages:
             # 요약 불필요 - 최근 메시지만 반환
             return self._convert_to_langchain_messages(recent_messages)
 
-        # 3. Redis에서 기존 요약 확인
+        # 4. 기존 요약 + 요약된 메시지 수 확인
+        # (턴 시작 시 읽은 세션 정보가 있으면 재사용, 없을 때만 HMGET 1 RTT)
         summary_key = f"session:{session_id}"
-        cached_summary = self.session_manager.redis.hget(summary_key, SUMMARY_REDIS_KEY)
-
-        # 4. 요약이 없거나 오래된 메시지가 추가되었으면 새로 요약
-        cached_msg_count = self.session_manager.redis.hget(summary_key, "summarized_count")
-
-        if not cached_summary or (cached_msg_count and int(cached_msg_count) < len(old_messages)):
-            print(f"[SummaryBuffer] 오래된 메시지 {len(old_messages)}개 요약 중...")
+        if session_info is not None:
+            cached_summary = session_info.get(SUMMARY_REDIS_KEY)
+            cached_msg_count = session_info.get("summarized_count")
+        else:
+            cached_summary, cached_msg_count = self.session_manager.redis.hmget(
+                summary_key, [SUMMARY_REDIS_KEY, "summarized_count"]
+            )
+
+        # 5. 밀려난 메시지가 일정 개수 이상 쌓였을 때만 요약 갱신 (LLM 호출을 묶어서 처리)
+        summarized_count = int(cached_msg_count) if cached_msg_count else 0
+        if isinstance(cached_summary, bytes):
+            cached_summary = cached_summary.decode('utf-8')
+        if not summarized_count:
+            cached_summary = None  # 요약 범위를 알 수 없는 이전 형식 요약은 버리고 새로 요약
+
+        # 요약 이후 새로 밀려난 메시지 (SUMMARY_REFRESH_BATCH개 미만이면 원본 그대로 버퍼에 유지)
+        pending_messages = old_messages[summarized_count:] if cached_summary else old_messages
+
+        if len(pending_messages) >= SUMMARY_REFRESH_BATCH:
+            if cached_summary:
+                # 기존 요약에 밀려난 메시지만 증분 반영 (요약 토큰을 증분으로 제한)
+                logger.debug("[SummaryBuffer] 기존 요약에 메시지 %d개 추가 반영 중...", len(pending_messages))
+                summary_text = await self._extend_summary(cached_summary, pending_messages)
+            else:
+                logger.debug("[SummaryBuffer] 오래된 메시지 %d개 요약 중...", len(old_messages))
 
-            # LLM으로 오래된 메시지 요약
-            summary_text = self._summarize_old_messages(old_messages)
+                # LLM으로 오래된 메시지 요약
+                summary_text = await self._summarize_old_messages(old_messages)
 
-            # Redis에 캐시
-            self.session_manager.redis.hset(summary_key, SUMMARY_REDIS_KEY, summary_text)
-            self.session_manager.redis.hset(summary_key, "summarized_count", len(old_messages))
+            # Redis에 캐시 (요약 + 요약된 메시지 수를 한 번에 저장)
+            self.session_manager.redis.hset(summary_key, mapping={
+                SUMMARY_REDIS_KEY: summary_text,
+                "summarized_count": len(old_messages)
+            })
+            pending_messages = []
 
-            print(f"[SummaryBuffer] 요약 완료 및 Redis 캐시 저장")
+            logger.debug("[SummaryBuffer] 요약 완료 및 Redis 캐시 저장")
         else:
-            summary_text = cached_summary.decode('utf-8') if isinstance(cached_summary, bytes) else cached_summary
-            print(f"[SummaryBuffer] Redis 캐시에서 요약 로드 (메시지 {len(old_messages)}개)")
-
-        # 5. 요약 메시지 + 최근 원본 메시지 반환
-        buffered_messages = [SystemMessage(content=f"**이전 대화 요약:**\n{summary_text}")]
+            summary_text = cached_summary
+            logger.debug(
+                "[SummaryBuffer] 요약 갱신 보류 (미반영 메시지 %d개를 원본으로 유지)", len(pending_messages)
+            )
+
+        # 6. 요약 메시지 + 아직 요약되지 않은 원본 메시지 + 최근 원본 메시지 반환
+        buffered_messages = []
+        if summary_text:
+            buffered_messages.append(SystemMessage(content=f"**이전 대화 요약:**\n{summary_text}"))
+        buffered_messages.extend(self._convert_to_langchain_messages(pending_messages))
         buffered_messages.extend(self._convert_to_langchain_messages(recent_messages))
 
         return buffered_messages
 
     def _convert_to_langchain_messages(self, messages: List[Dict]) -> List:
         """Redis 메시지를 LangChain Message 객체로 변환"""
-        langchain_messages = []
-        for msg in messages:
-            if msg["role"] == "user":
-                langchain_messages.append(HumanMessage(content=msg["content"]))
-            elif msg["role"] == "assistant":
-                langchain_messages.append(AIMessage(content=msg["content"]))
-        return langchain_messages
-
-    def _summarize_old_messages(self, old_messages: List[Dict]) -> str:
+        return [
+            _ROLE_MAP[msg["role"]](content=msg["content"])
+            for msg in messages
+            if msg["role"] in _ROLE_MAP
+        ]
+
+    async def _summarize_old_messages(self, old_messages: List[Dict]) -> str:
         """
         오래된 메시지들을 LLM으로 요약
 
@@ -268,11 +543,8 @@ class ChatOrchestrator:
         Returns:
             요약 텍스트
         """
-        # 대화 텍스트 구성
-        conversation_text = ""
-        for msg in old_messages:
-            role = "사용자" if msg["role"] == "user" else "상담사"
-            conversation_text += f"{role}: {msg['content']}\n\n"
+        # 대화 텍스트 구성 (한 번의 join으로 생성)
+        conversation_text = _format_transcript(old_messages)
 
         # 요약 프롬프트
         summary_prompt = f"""다음은 상담 대화의 초기 부분입니다. 이를 간결하게 요약해주세요.
@@ -292,7 +564,43 @@ class ChatOrchestrator:
             HumanMessage(content=summary_prompt)
         ]
 
-        response = self.llm.invoke(messages)
+        response = await self.llm.ainvoke(messages)
+        return response.content.strip()
+
+    async def _extend_summary(self, cached_summary: str, new_messages: List[Dict]) -> str:
+        """
+        기존 요약에 새로 밀려난 메시지들을 반영하여 요약 갱신
+
+        Args:
+            cached_summary: 기존 요약 텍스트
+            new_messages: 기존 요약 이후 요약 대상이 된 메시지 리스트
+
+        Returns:
+            갱신된 요약 텍스트
+        """
+        conversation_text = _format_transcript(new_messages)
+
+        extend_prompt = f"""다음은 상담 대화의 기존 요약과 그 이후 이어진 대화입니다. 기존 요약에 새 대화 내용을 반영하여 하나의 요약으로 갱신해주세요.
+
+**기존 요약:**
+{cached_summary}
+
+**이어진 대화 내용:**
+{conversation_text}
+
+**요약 지침:**
+- 핵심 주제와 감정만 포함
+- 3-5 문장으로 간결하게
+- 사용자의 관점에서 작성
+
+갱신된 요약:"""
+
+        messages = [
+            SystemMessage(content="당신은 상담 대화를 요약하는 전문가입니다."),
+            HumanMessage(content=extend_prompt)
+        ]
+
+        response = await self.llm.ainvoke(messages)
         return response.content.strip()
 
     def _build_context_with_memory(
@@ -313,25 +621,27 @@ class ChatOrchestrator:
         """
         messages = []
 
-        # 1. 시스템 프롬프트
-        system_content = self.system_prompt
-
-        # 2. PDF 매뉴얼 전문 지식 추가 (있으면)
-        if manual_context:
-            knowledge_context = f"\n\n**전문 지식 (참고 자료):**\n{manual_context}\n"
-            system_content += "\n" + knowledge_context
+        # 1. 시스템 프롬프트 (추가 컨텍스트가 없으면 미리 만든 메시지 재사용)
+        if not manual_context and not similar_diaries:
+            messages.append(self._system_prompt_msg)
+        else:
+            # 조각을 모아 마지막에 한 번만 join (긴 시스템 프롬프트를 += 로 반복 복사하지 않도록)
+            parts = [self.system_prompt]
 
-        # 3. 유사 일기 추가 (있으면)
-        if similar_diaries:
-            diary_context = "\n\n**과거 일기 참고:**\n"
-            for idx, diary in enumerate(similar_diaries, 1):
-                created_at = diary["metadata"].get("created_at", "알 수 없음")
-                content = diary["content"][:200]  # 처음 200자만
-                diary_context += f"{idx}. [{created_at}] {content}...\n"
+            # 2. PDF 매뉴얼 전문 지식 추가 (있으면)
+            if manual_context:
+                parts.append(f"\n\n\n**전문 지식 (참고 자료):**\n{manual_context}\n")
 
-            system_content += "\n" + diary_context
+            # 3. 유사 일기 추가 (있으면, 저장 시 만든 미리보기 사용 - 이전 일기는 처음 200자)
+            if similar_diaries:
+                parts.append("\n\n\n**과거 일기 참고:**\n")
+                parts.extend(
+                    f"{idx}. [{diary['metadata'].get('created_at', '알 수 없음')}] "
+                    f"{diary['metadata'].get('snippet') or diary['content'][:DIARY_SNIPPET_LENGTH]}...\n"
+                    for idx, diary in enumerate(similar_diaries, 1)
+                )
 
-        messages.append(SystemMessage(content=system_content))
+            messages.append(SystemMessage(content="".join(parts)))
 
         # 4. 대화 요약 버퍼에서 가져온 버퍼된 대화 내역 추가
         # (자동으로 요약된 과거 대화 + 최근 원본 메시지)
@@ -342,31 +652,56 @@ class ChatOrchestrator:
 
         return messages
 
-    def _generate_response(self, messages: List) -> str:
+    async def _generate_response(self, messages: List) -> str:
         """
         LLM을 호출하여 응답 생성
         """
-        response = self.llm.invoke(messages)
+        response = await self.llm.ainvoke(messages)
         return response.content
 
+    async def _stream_response(
+        self,
+        session_id: str,
+        user_message: str,
+        messages: List
+    ) -> AsyncIterator[str]:
+        """
+        LLM 응답 스트리밍 후 대화 저장
+
+        클라이언트 연결이 끊겨 스트림이 중단되어도 사용자에게 전달된 응답까지는 저장한다.
+        (저장은 스레드에서 실행하고 shield로 감싸, 연결 종료로 태스크가 취소되어도 끝까지 완료)
+        """
+        chunks = []
+        try:
+            async for chunk in self.llm.astream(messages):
+                if chunk.content:
+                    chunks.append(chunk.content)
+                    yield chunk.content
+        finally:
+            if chunks:
+                await asyncio.shield(asyncio.to_thread(
+                    self.session_manager.add_messages,
+                    session_id,
+                    [("user", user_message), ("assistant", "".join(chunks))]
+                ))
+
     # --- [주석] main_with_redis.py 로직을 적용하여 수정한 일기 생성 메서드 ---
     def _extract_json_from_markdown(self, text: str) -> Optional[str]:
         """
         AI가 반환한 마크다운(```json ... ```) 텍스트에서
         순수한 JSON 문자열({ ... })만 추출합니다.
         """
-        match = re.search(r'\{.*\}', text, re.DOTALL)
+        match = _JSON_BLOCK_RE.search(text)
         if match:
             return match.group(0)
-        else:
-            if text.strip().startswith("{"):
-                return text
-        return None
+        return text if text.lstrip().startswith("{") else None
 
-    def summarize_conversation_to_diary(self, session_id: str) -> Dict[str, str]:
+    async def summarize_conversation_to_diary(self, session_id: str) -> Dict[str, str]:
         """
         대화 요약 → CBT 4요소 추출 → 일기 및 다른 관점 생성
 
+        다른 관점과 일기는 모두 CBT 데이터에만 의존하므로 동시에 생성한다.
+
         Returns:
             생성된 일기 및 다른 관점을 포함한 딕셔너리
         """
@@ -379,19 +714,19 @@ class ChatOrchestrator:
             }
 
         # 대화 내용을 하나의 문자열로 변환
-        transcript = "\n".join([f"{'사용자' if msg['role'] == 'user' else '상담사'}: {msg['content']}" for msg in full_conversation])
+        transcript = _format_transcript(full_conversation, separator="\n")
 
         try:
             # 2. LLM을 통해 대화 내용에서 CBT 4요소(S-T-E-B) 추출
-            cbt_data_str = self.chain_extract_cbt.invoke({
+            cbt_data_str = await self.chain_extract_cbt.ainvoke({
                 "transcript": transcript
             })
 
             # 3. AI가 생성한 응답에서 순수 JSON 부분만 추출
             pure_json_str = self._extract_json_from_markdown(cbt_data_str)
             if not pure_json_str:
+                logger.error("오류: AI 응답에서 CBT 데이터를 추출하지 못했습니다. (응답: %s)", cbt_data_str)
                 error_message = f"오류: AI 응답에서 CBT 데이터를 추출하지 못했습니다. (응답: {cbt_data_str})"
-                print(error_message)
                 return {
                     "diary_text": "일기 생성 중 오류가 발생했습니다. 대화 내용을 분석하는 데 실패했습니다.",
                     "alternative_perspective": error_message
@@ -401,14 +736,14 @@ class ChatOrchestrator:
             try:
                 cbt_data = json.loads(pure_json_str)
             except json.JSONDecodeError:
+                logger.error("오류: AI가 생성한 CBT 데이터의 형식이 잘못되었습니다. (내용: %s)", pure_json_str)
                 error_message = f"오류: AI가 생성한 CBT 데이터의 형식이 잘못되었습니다. (내용: {pure_json_str})"
-                print(error_message)
                 return {
                     "diary_text": "일기 생성 중 오류가 발생했습니다. 분석된 데이터 형식이 올바르지 않습니다.",
                     "alternative_perspective": error_message
                 }
 
-            # 5. 추출된 '자동적 사고' 목록을 바탕으로 '다른 관점' 생성
+            # 5. 추출된 '자동적 사고' 목록 정리
             thoughts_list = cbt_data.get('thoughts', [])
             thought_texts = []
             for t in thoughts_list:
@@ -417,17 +752,22 @@ class ChatOrchestrator:
                 elif isinstance(t, str):
                     thought_texts.append(t)
             
-            final_alternative_perspective = ""
-            if thought_texts:
-                final_alternative_perspective = self.chain_gen_perspective.invoke({
-                    "thoughts_text": "\n- ".join(thought_texts)
-                })
-
-            # 6. 추출된 CBT 데이터를 바탕으로 1인칭 시점의 일기 생성
-            final_diary_text = self.chain_create_diary.invoke({
+            # 6. '다른 관점' + 1인칭 시점의 일기 동시 생성
+            diary_task = self.chain_create_diary.ainvoke({
                 "cbt_json_data": json.dumps(cbt_data, ensure_ascii=False)
             })
 
+            final_alternative_perspective = ""
+            if thought_texts:
+                final_alternative_perspective, final_diary_text = await asyncio.gather(
+                    self.chain_gen_perspective.ainvoke({
+                        "thoughts_text": "\n- ".join(thought_texts)
+                    }),
+                    diary_task
+                )
+            else:
+                final_diary_text = await diary_task
+
             # 7. 최종 결과 반환
             return {
                 "diary_text": final_diary_text,
@@ -435,8 +775,8 @@ class ChatOrchestrator:
             }
 
         except Exception as e:
+            logger.exception("일기 생성 중 예기치 않은 오류 발생: %s", e)
             error_message = f"일기 생성 중 예기치 않은 오류 발생: {str(e)}"
-            print(error_message)
             return {
                 "diary_text": "일기 생성 중 알 수 없는 오류가 발생했습니다.",
                 "alternative_perspective": error_message
@@ -466,5 +806,8 @@ def get_chat_orchestrator(
 
         # vector_store는 chatbot 라우터에서 초기화된 전역 인스턴스 사용
         _orchestrator = ChatOrchestrator(sm, ds, vector_store)
+    elif vector_store is not None and _orchestrator.vector_store is not vector_store:
+        # /initialize로 벡터 스토어가 교체되면 새 인스턴스로 갱신
+        _orchestrator.vector_store = vector_store
 
     return _orchestrator
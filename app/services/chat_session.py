@@ -1,10 +1,11 @@
 # services/chat_session.py
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional
-import json
+from typing import List, Dict, Optional, Tuple
+import orjson
 import uuid
 import redis
 from app.config import get_settings
+from app.utils.tokenizer import get_tokenizer
 
 class ChatSessionManager:
     """
@@ -28,6 +29,9 @@ class ChatSessionManager:
                 decode_responses=True  # 자동 문자열 디코딩
             )
 
+        # 메시지 저장 시 토큰 수 계산용 (프로세스 전역 인코더 공유)
+        self.tokenizer = get_tokenizer()
+
 
     def create_session(self, user_id: str) -> str:
         """
@@ -49,7 +53,11 @@ class ChatSessionManager:
             "user_id": user_id,
             "created_at": datetime.now().isoformat(),
             "last_activity": datetime.now().isoformat(),
-            "message_count": 0
+            "message_count": 0,
+            "total_tokens": 0,  # 전체 대화 토큰 수 (메시지 추가 시 누적)
+            # total_tokens를 세션 생성 시부터 누적했다는 표시
+            # (이 필드가 없는 이전 세션은 HINCRBY가 중간부터 누적하므로 합계를 신뢰하지 않음)
+            "tokens_tracked": 1
         }
 
         # 세션 메타데이터 저장 (Hash)
@@ -75,20 +83,64 @@ class ChatSessionManager:
         if not self.redis.exists(session_key):
             return False
 
-        # 메시지 객체 생성
+        # 메시지 객체 생성 (토큰 수는 저장 시 한 번만 계산)
+        tokens = len(self.tokenizer.encode_ordinary(content))
         message = {
             "role": role,
             "content": content,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": datetime.now().isoformat(),
+            "tokens": tokens
         }
 
         # 메시지 리스트에 추가 (RPUSH: 오른쪽에 추가)
         messages_key = f"messages:{session_id}"
-        self.redis.rpush(messages_key, json.dumps(message))
+        self.redis.rpush(messages_key, orjson.dumps(message))
 
         # 세션 메타데이터 업데이트
         self.redis.hset(session_key, "last_activity", datetime.now().isoformat())
         self.redis.hincrby(session_key, "message_count", 1)
+        self.redis.hincrby(session_key, "total_tokens", tokens)
+
+        return True
+
+    def add_messages(self, session_id: str, messages: List[Tuple[str, str]]) -> bool:
+        """
+        세션에 여러 메시지를 한 번에 추가 (Redis 파이프라인, 1 RTT)
+
+        Args:
+            session_id: 세션 ID
+            messages: (role, content) 리스트 (예: 사용자 메시지 + 상담사 응답)
+
+        Returns:
+            성공 여부
+        """
+        session_key = f"session:{session_id}"
+
+        # 세션 존재 확인
+        if not self.redis.exists(session_key):
+            return False
+
+        messages_key = f"messages:{session_id}"
+        now = datetime.now().isoformat()
+
+        pipe = self.redis.pipeline()
+        total_tokens = 0
+        for role, content in messages:
+            tokens = len(self.tokenizer.encode_ordinary(content))
+            total_tokens += tokens
+            message = {
+                "role": role,
+                "content": content,
+                "timestamp": now,
+                "tokens": tokens
+            }
+            pipe.rpush(messages_key, orjson.dumps(message))
+
+        # 세션 메타데이터 업데이트
+        pipe.hset(session_key, "last_activity", now)
+        pipe.hincrby(session_key, "message_count", len(messages))
+        pipe.hincrby(session_key, "total_tokens", total_tokens)
+        pipe.execute()
 
         return True
 
@@ -111,8 +163,8 @@ class ChatSessionManager:
         messages = []
         for msg_str in raw_messages:
             try:
-                messages.append(json.loads(msg_str))
-            except json.JSONDecodeError:
+                messages.append(orjson.loads(msg_str))
+            except orjson.JSONDecodeError:
                 continue
 
         return messages
@@ -132,8 +184,8 @@ class ChatSessionManager:
         messages = []
         for msg_str in raw_messages:
             try:
-                messages.append(json.loads(msg_str))
-            except json.JSONDecodeError:
+                messages.append(orjson.loads(msg_str))
+            except orjson.JSONDecodeError:
                 continue
 
         return messages
@@ -145,12 +197,9 @@ class ChatSessionManager:
         Returns:
             세션 정보 또는 None
         """
-        session_key = f"session:{session_id}"
-
-        if not self.redis.exists(session_key):
-            return None
-
-        return self.redis.hgetall(session_key)
+        # 없는 키는 HGETALL이 빈 dict를 반환하므로 EXISTS 없이 1 RTT로 확인
+        session_data = self.redis.hgetall(f"session:{session_id}")
+        return session_data or None
 
 
     # def delete_session(self, session_id: str):
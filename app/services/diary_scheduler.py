@@ -6,7 +6,7 @@ from typing import List
 import traceback
 
 from app.services.chat_session import get_session_manager
-from app.services.chat_orchestrator import ChatOrchestrator
+from app.services.chat_orchestrator import get_chat_orchestrator
 from app.services.diary_service import get_diary_service
 from app.services.vector_store import get_vector_store_service
 
@@ -146,16 +146,16 @@ class DiaryScheduler:
             일기 딕셔너리 {"diary_text": str, "alternative_perspective": str}
         """
         try:
-            # Orchestrator 생성
+            # Orchestrator 조회 (세션마다 새로 만들지 않고 전역 인스턴스 재사용)
             vector_store = get_vector_store_service()
-            orchestrator = ChatOrchestrator(
+            orchestrator = get_chat_orchestrator(
                 session_manager=self.session_manager,
                 diary_service=self.diary_service,
                 vector_store=vector_store
             )
 
             # 요약 (딕셔너리 반환)
-            diary_result = orchestrator.summarize_conversation_to_diary(session_id)
+            diary_result = await orchestrator.summarize_conversation_to_diary(session_id)
 
             return diary_result
 
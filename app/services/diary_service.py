@@ -1,13 +1,17 @@
 # services/diary_service.py
 from typing import List, Dict, Optional
 from datetime import datetime, timedelta
+import json
 from langchain_postgres import PGVector
 from langchain_openai import OpenAIEmbeddings
 from langchain_core.documents import Document
-from sqlalchemy.orm import Session
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Connection, Engine
 from app.config import get_settings
 import uuid
 
+DIARY_SNIPPET_LENGTH = 200  # 상담 컨텍스트에 넣을 일기 미리보기 길이
+
 class DiaryService:
     """
     일기 관리 서비스 (PostgreSQL + pgvector)
@@ -22,11 +26,43 @@ class DiaryService:
         self.database_url = settings.database_url
 
         # 임베딩 모델 (text-embedding-3-small, 1536 차원)
-        self.embeddings = OpenAIEmbeddings(model='text-embedding-3-small')
+        self.embeddings = OpenAIEmbeddings(
+            model='text-embedding-3-small',
+            request_timeout=settings.openai_timeout,
+            max_retries=settings.openai_max_retries
+        )
 
         # 일기 전용 컬렉션
         self.collection_name = "user_diaries"
 
+        # 직접 SQL 조회용 엔진 (커넥션 풀 재사용)
+        # 벡터 검색 스레드들이 동시에 접근하므로 지연 생성하지 않고 여기서 한 번만 생성 (연결은 첫 사용 시)
+        self._engine: Engine = create_engine(self.database_url, pool_pre_ping=True)
+        self._collection_id = None  # 일기 컬렉션 uuid 캐시
+
+    def _get_collection_id(self, conn: Connection):
+        """일기 컬렉션 uuid 조회 (한 번 찾으면 캐시)"""
+        if self._collection_id is None:
+            result = conn.execute(text("""
+                SELECT uuid FROM langchain_pg_collection WHERE name = :collection_name LIMIT 1
+            """), {"collection_name": self.collection_name})
+            collection_row = result.fetchone()
+            if collection_row:
+                self._collection_id = collection_row[0]
+        return self._collection_id
+
+    async def aembed_batch(self, texts: List[str]) -> List[List[float]]:
+        """
+        텍스트 여러 개를 한 번의 임베딩 API 호출로 변환 (OpenAI 비동기 클라이언트 사용)
+
+        Args:
+            texts: 임베딩할 텍스트 리스트
+
+        Returns:
+            텍스트별 임베딩 벡터 리스트 (입력 순서 유지)
+        """
+        return await self.embeddings.aembed_documents(texts)
+
     def save_diary(
         self,
         user_id: str,
@@ -63,7 +99,8 @@ class DiaryService:
             "diary_date": diary_date,  # 일기 날짜 (06:00 기준)
             "created_at": now.isoformat(),  # 실제 생성 시각
             "alternative_perspective": alternative_perspective,
-            "message_count": message_count
+            "message_count": message_count,
+            "snippet": diary_content[:DIARY_SNIPPET_LENGTH]  # 검색 시 바로 쓰는 미리보기
         }
 
         # Document 객체 생성
@@ -92,21 +129,13 @@ class DiaryService:
             diary_date: 일기 날짜 (YYYY-MM-DD)
         """
         try:
-            from sqlalchemy import create_engine, text
-
-            engine = create_engine(self.database_url)
-            with engine.connect() as conn:
+            with self._engine.connect() as conn:
                 # collection_id 조회
-                result = conn.execute(text("""
-                    SELECT uuid FROM langchain_pg_collection WHERE name = :collection_name LIMIT 1
-                """), {"collection_name": self.collection_name})
-                collection_row = result.fetchone()
+                collection_id = self._get_collection_id(conn)
 
-                if not collection_row:
+                if not collection_id:
                     return  # collection이 없으면 삭제할 일기도 없음
 
-                collection_id = collection_row[0]
-
                 # 같은 날짜의 기존 일기 삭제
                 delete_query = text("""
                     DELETE FROM langchain_pg_embedding
@@ -130,7 +159,8 @@ class DiaryService:
         self,
         user_id: str,
         query: str,
-        k: int = 3
+        k: int = 3,
+        query_vector: Optional[List[float]] = None
     ) -> List[Dict]:
         """
         유사 일기 검색 (RAG 리트리벌)
@@ -139,34 +169,53 @@ class DiaryService:
             user_id: 사용자 ID (네임스페이스 필터)
             query: 검색 쿼리 (사용자 메시지)
             k: 반환할 일기 개수 (기본 3개)
+            query_vector: 미리 계산한 query 임베딩 (있으면 재임베딩 생략)
 
         Returns:
             유사 일기 리스트 (content + metadata)
         """
         try:
-            # PGVector 인스턴스 생성
-            vectorstore = PGVector(
-                collection_name=self.collection_name,
-                connection=self.database_url,
-                embeddings=self.embeddings
-            )
-
-            # 유사도 검색 (user_id 필터링)
-            # PGVector는 metadata 필터를 지원합니다
-            results = vectorstore.similarity_search(
-                query,
-                k=k,
-                filter={"user_id": user_id}  # user_id로 필터링
-            )
-
-            # 결과 포맷팅
-            diaries = []
-            for doc in results:
-                diaries.append({
-                    "content": doc.page_content,
-                    "metadata": doc.metadata
+            if query_vector is None:
+                query_vector = self.embeddings.embed_query(query)
+
+            with self._engine.connect() as conn:
+                collection_id = self._get_collection_id(conn)
+                if not collection_id:
+                    return []  # 아직 저장된 일기가 없음
+
+                # 사용자 파티션 검색: user_id 인덱스(alembic 7c2f4e9a1b3d)로 해당 사용자 일기만 좁힌 뒤
+                # 코사인 거리로 정렬 (전체 컬렉션 스캔 후 필터링하지 않음)
+                # MATERIALIZED: 테이블 전체 HNSW 인덱스로 정렬 후 user_id로 걸러 결과가 모자라지 않도록
+                # 사용자 일기를 먼저 확정한 뒤 정확한 거리로 정렬
+                results = conn.execute(text("""
+                    WITH user_diaries AS MATERIALIZED (
+                        SELECT document, cmetadata, embedding
+                        FROM langchain_pg_embedding
+                        WHERE collection_id = :collection_id
+                          AND cmetadata->>'user_id' = :user_id
+                    )
+                    SELECT document, cmetadata
+                    FROM user_diaries
+                    ORDER BY embedding <=> CAST(:query_vector AS vector)
+                    LIMIT :k
+                """), {
+                    "collection_id": collection_id,
+                    "user_id": str(user_id),
+                    "query_vector": str(list(query_vector)),
+                    "k": k
                 })
 
+                # 결과 포맷팅
+                diaries = []
+                for row in results:
+                    metadata = row[1]
+                    if isinstance(metadata, str):
+                        metadata = json.loads(metadata)
+                    diaries.append({
+                        "content": row[0],
+                        "metadata": metadata
+                    })
+
             return diaries
 
         except Exception as e:
@@ -219,28 +268,18 @@ class DiaryService:
             일기 리스트 (content + metadata), 날짜순 정렬 (최신순)
         """
         try:
-            from sqlalchemy import create_engine, text
-            import json
-            
             # 날짜 범위 계산 (현재 시간 기준)
             now = datetime.now()
             cutoff_date = now - timedelta(days=days)
             
             # collection_id 가져오기
-            engine = create_engine(self.database_url)
-            with engine.connect() as conn:
-                # collection_id 조회
-                result = conn.execute(text("""
-                    SELECT uuid FROM langchain_pg_collection WHERE name = :collection_name LIMIT 1
-                """), {"collection_name": self.collection_name})
-                collection_row = result.fetchone()
+            with self._engine.connect() as conn:
+                collection_id = self._get_collection_id(conn)
                 
-                if not collection_row:
+                if not collection_id:
                     print(f"Collection '{self.collection_name}'를 찾을 수 없습니다.")
                     return []
                 
-                collection_id = collection_row[0]
-                
                 # langchain_pg_embedding 테이블에서 직접 조회
                 # cmetadata의 user_id와 diary_date 필터링
                 query = text("""
@@ -321,9 +360,6 @@ class DiaryService:
             일기 데이터 (없으면 None)
         """
         try:
-            from sqlalchemy import create_engine, text
-            import json
-            
             # 날짜 파싱 및 검증
             try:
                 target_date = datetime.strptime(date, "%Y-%m-%d").date()
@@ -331,20 +367,13 @@ class DiaryService:
                 raise ValueError(f"날짜 형식이 올바르지 않습니다. YYYY-MM-DD 형식으로 입력해주세요: {date}")
             
             # collection_id 가져오기
-            engine = create_engine(self.database_url)
-            with engine.connect() as conn:
-                # collection_id 조회
-                result = conn.execute(text("""
-                    SELECT uuid FROM langchain_pg_collection WHERE name = :collection_name LIMIT 1
-                """), {"collection_name": self.collection_name})
-                collection_row = result.fetchone()
+            with self._engine.connect() as conn:
+                collection_id = self._get_collection_id(conn)
                 
-                if not collection_row:
+                if not collection_id:
                     print(f"Collection '{self.collection_name}'를 찾을 수 없습니다.")
                     return None
                 
-                collection_id = collection_row[0]
-                
                 # langchain_pg_embedding 테이블에서 특정 날짜의 일기 조회
                 # diary_date가 해당 날짜인 일기 찾기 (ISO 형식 문자열에서 날짜 부분만 비교)
                 # diary_date가 '2025-11-12T10:30:00' 형식이므로 날짜 부분만 추출
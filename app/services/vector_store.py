@@ -2,9 +2,39 @@ from langchain_postgres import PGVector
 from langchain_openai import OpenAIEmbeddings, ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
-from langchain_core.runnables import RunnablePassthrough
-from typing import Optional
+from langchain_core.runnables import RunnableLambda, RunnableParallel, RunnablePassthrough
+from sqlalchemy import text
+from typing import List, Optional
+import asyncio
+import logging
 import os
+import threading
+from app.utils.executors import run_vector_search
+
+logger = logging.getLogger(__name__)
+
+RETRIEVER_TOP_K = 3  # 질문당 검색할 문서 수
+QA_MAX_TOKENS = 512  # 매뉴얼 답변 출력 토큰 상한
+EMBED_CONCURRENCY = 8  # PDF 임베딩 시 동시에 보낼 배치 요청 수
+EMBEDDING_DIM = 1536  # text-embedding-3-small 차원 (HNSW 인덱스는 고정 차원 컬럼 필요)
+
+# PGVector 엔진 옵션: HNSW 인덱스(alembic 9e5a7b3c2d1f)는 테이블 전체(매뉴얼 + 일기)를 대상으로 하므로
+# 컬렉션 필터로 후보가 걸러져도 k개를 채울 때까지 계속 탐색 (pgvector 0.8+ iterative scan)
+# pgvector 0.8 미만에서는 마이그레이션이 HNSW 인덱스를 만들지 않아(순차 스캔) 이 설정이 필요 없고,
+# 서버는 정의되지 않은 hnsw.* 파라미터로 경고 후 제거함
+PGVECTOR_ENGINE_ARGS = {"connect_args": {"options": "-c hnsw.iterative_scan=strict_order"}}
+BUILDING_COLLECTION_SUFFIX = "__building"  # 재구축 중 임시 컬렉션 이름 접미사
+
+
+def _format_docs(docs) -> str:
+    """문서 리스트를 문자열로 변환"""
+    return "\n\n".join(doc.page_content for doc in docs)
+
+
+def _to_answer_input(inputs: dict) -> dict:
+    """검색 결과(docs) + 질문을 답변 체인 입력으로 변환"""
+    return {"context": _format_docs(inputs["docs"]), "question": inputs["question"]}
+
 
 class VectorStoreService:
     """
@@ -29,53 +59,83 @@ class VectorStoreService:
         os.environ["OPENAI_API_KEY"] = openai_api_key
 
         # 임베딩 모델 설정 - 1536 차원
-        self.embeddings = OpenAIEmbeddings(model='text-embedding-3-small')
+        from app.config import get_settings
+        settings = get_settings()
+        self.embeddings = OpenAIEmbeddings(
+            model='text-embedding-3-small',
+            request_timeout=settings.openai_timeout,
+            max_retries=settings.openai_max_retries
+        )
 
         self.vectorstore: Optional[PGVector] = None  # 벡터 DB
         self.qa_chain = None  # 질의응답 체인 (LCEL)
+        self.answer_chain = None  # 검색된 문서로 답변만 생성하는 체인
         self.retriever = None  # 문서 검색기
 
-    def create_vectorstore(self, documents, batch_size: int = 100):
-        """
-        벡터 스토어 생성 (배치 처리)
-        - 문서들을 임베딩으로 변환
-        - PostgreSQL에 저장
-        - 대용량 문서 처리를 위해 배치 단위로 처리
-        """
-        print(f"총 {len(documents)}개의 문서 청크를 임베딩합니다...")
-
-        # 기존 컬렉션 삭제 후 새로 생성
-        if self.vectorstore:
-            # 기존 벡터스토어가 있으면 삭제
-            try:
-                PGVector.from_existing_index(
-                    embedding=self.embeddings,
-                    collection_name=self.collection_name,
-                    connection=self.database_url,
-                ).delete_collection()
-                print("기존 벡터 스토어 삭제 완료")
-            except:
-                pass
-
-        # 배치 단위로 나누어 처리
-        for i in range(0, len(documents), batch_size):
-            batch = documents[i:i + batch_size]
-            print(f"배치 {i // batch_size + 1}/{(len(documents) - 1) // batch_size + 1} 처리 중... ({len(batch)}개)")
-
-            if i == 0:
-                # 첫 번째 배치: 새 벡터스토어 생성
-                self.vectorstore = PGVector.from_documents(
-                    documents=batch,
-                    embedding=self.embeddings,
-                    collection_name=self.collection_name,
-                    connection=self.database_url,
-                    pre_delete_collection=True  # 기존 컬렉션 삭제
+    async def create_vectorstore(self, documents, batch_size: int = 100, concurrency: int = EMBED_CONCURRENCY):
+        """
+        벡터 스토어 생성 (비동기 배치 처리)
+        - 문서들을 배치 단위로 나누어 임베딩 API를 동시에 호출 (Semaphore로 동시 요청 수 제한)
+        - 계산된 임베딩을 임시 컬렉션에 저장 (재임베딩 없이 add_embeddings로 바로 삽입)
+        - 저장이 끝나면 한 트랜잭션에서 기존 컬렉션을 임시 컬렉션으로 교체
+          (재구축 중에도 기존 컬렉션으로 매뉴얼 검색이 계속 동작)
+        - PGVector는 동기 엔진이므로 DB 작업은 스레드에서 실행
+        """
+        logger.info("총 %d개의 문서 청크를 임베딩합니다...", len(documents))
+
+        batches = [documents[i:i + batch_size] for i in range(0, len(documents), batch_size)]
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def _embed(idx: int, batch) -> List[List[float]]:
+            async with semaphore:
+                logger.debug("배치 %d/%d 임베딩 중... (%d개)", idx + 1, len(batches), len(batch))
+                return await self.embeddings.aembed_documents([doc.page_content for doc in batch])
+
+        # 1. 모든 배치 임베딩 동시 실행 (순서 유지)
+        batch_vectors = await asyncio.gather(*(_embed(idx, batch) for idx, batch in enumerate(batches)))
+
+        # 2. 임시 컬렉션에 임베딩 삽입 → 기존 컬렉션과 교체
+        def _store():
+            building_name = f"{self.collection_name}{BUILDING_COLLECTION_SUFFIX}"
+            building = PGVector(
+                embeddings=self.embeddings,
+                collection_name=building_name,
+                connection=self.database_url,
+                embedding_length=EMBEDDING_DIM,
+                pre_delete_collection=True  # 이전에 실패하고 남은 임시 컬렉션 정리
+            )
+            for batch, vectors in zip(batches, batch_vectors):
+                building.add_embeddings(
+                    texts=[doc.page_content for doc in batch],
+                    embeddings=vectors,
+                    metadatas=[doc.metadata for doc in batch]
+                )
+
+            # 기존 컬렉션 삭제(임베딩은 CASCADE) + 임시 컬렉션 이름 변경을 한 트랜잭션으로
+            # (검색 쪽은 커밋 전까지 기존 컬렉션, 커밋 후 새 컬렉션을 보게 됨)
+            with building._engine.begin() as conn:
+                conn.execute(
+                    text("DELETE FROM langchain_pg_collection WHERE name = :name"),
+                    {"name": self.collection_name}
                 )
-            else:
-                # 이후 배치: 기존 벡터스토어에 추가
-                self.vectorstore.add_documents(batch)
+                conn.execute(
+                    text("UPDATE langchain_pg_collection SET name = :name WHERE name = :building_name"),
+                    {"name": self.collection_name, "building_name": building_name}
+                )
+            building._engine.dispose()
+
+            vectorstore = PGVector(
+                embeddings=self.embeddings,
+                collection_name=self.collection_name,
+                connection=self.database_url,
+                embedding_length=EMBEDDING_DIM,
+                engine_args=PGVECTOR_ENGINE_ARGS
+            )
+            return vectorstore
+
+        self.vectorstore = await asyncio.to_thread(_store)
 
-        print("임베딩 완료!")
+        logger.info("임베딩 완료!")
         return self.vectorstore
 
     def load_vectorstore(self):
@@ -88,17 +148,36 @@ class VectorStoreService:
                 collection_name=self.collection_name,
                 connection=self.database_url,
                 embeddings=self.embeddings,
+                embedding_length=EMBEDDING_DIM,
+                engine_args=PGVECTOR_ENGINE_ARGS
             )
             # 테스트 쿼리로 데이터 존재 확인
             result = self.vectorstore.similarity_search("test", k=1)
             if result:
-                print(f"벡터 스토어 로드 완료: {len(result)}개 문서 확인")
+                logger.info("벡터 스토어 로드 완료: %d개 문서 확인", len(result))
                 return self.vectorstore
             else:
-                print("벡터 스토어가 비어있습니다.")
+                logger.info("벡터 스토어가 비어있습니다.")
                 return None
         except Exception as e:
-            print(f"벡터 스토어 로드 실패: {e}")
+            logger.warning("벡터 스토어 로드 실패: %s", e)
+            return None
+
+    def _get_qa_cache(self, settings):
+        """
+        매뉴얼 QA LLM 전용 응답 캐시 (llm_cache_enabled일 때만, 동일 프롬프트 재호출 시 OpenAI 왕복 생략)
+
+        - temperature=0인 이 LLM에만 연결 (상담 응답/요약/일기 체인은 캐시하지 않음)
+        - 세션 관리자의 Redis 연결 재사용, TTL 후 자동 삭제
+        """
+        if not settings.llm_cache_enabled:
+            return None
+        try:
+            from langchain_community.cache import RedisCache
+            from app.services.chat_session import get_session_manager
+            return RedisCache(redis_=get_session_manager().redis, ttl=settings.llm_cache_ttl)
+        except Exception as e:
+            logger.warning("매뉴얼 QA 응답 캐시 설정 실패 (캐시 없이 동작): %s", e)
             return None
 
     def create_qa_chain(self, model_name: str = "gpt-4o-mini"):
@@ -110,10 +189,16 @@ class VectorStoreService:
         if not self.vectorstore:
             raise ValueError("벡터 스토어가 없습니다. create_vectorstore를 먼저 호출하세요.")
 
-        # LLM 모델 설정
+        # LLM 모델 설정 (타임아웃/재시도/출력 토큰 상한으로 지연 응답이 워커를 점유하지 않도록)
+        from app.config import get_settings
+        settings = get_settings()
         llm = ChatOpenAI(
             model=model_name,
-            temperature=0  # 일관된 답변을 위해 0으로 설정
+            temperature=0,  # 일관된 답변을 위해 0으로 설정
+            timeout=settings.openai_timeout,
+            max_retries=settings.openai_max_retries,
+            max_tokens=QA_MAX_TOKENS,
+            cache=self._get_qa_cache(settings)
         )
 
         # 친절한 한국어 프롬프트 (LCEL용)
@@ -131,49 +216,103 @@ class VectorStoreService:
         prompt = ChatPromptTemplate.from_template(prompt_template)
 
         # Retriever 생성 (상위 3개 문서 검색)
-        self.retriever = self.vectorstore.as_retriever(search_kwargs={"k": 3})
+        self.retriever = self.vectorstore.as_retriever(search_kwargs={"k": RETRIEVER_TOP_K})
 
-        # LCEL 체인 구성
-        def format_docs(docs):
-            """문서 리스트를 문자열로 변환"""
-            return "\n\n".join(doc.page_content for doc in docs)
+        # 답변 생성 체인: 프롬프트 → LLM → 파싱 (context는 호출 측에서 구성)
+        self.answer_chain = prompt | llm | StrOutputParser()
 
-        # RAG 체인: 검색 → 포맷 → 프롬프트 → LLM → 파싱
+        # RAG 체인: 검색 1회 → 같은 문서로 답변 생성 (결과: docs, question, answer)
         self.qa_chain = (
-            {
-                "context": self.retriever | format_docs,
-                "question": RunnablePassthrough()
-            }
-            | prompt
-            | llm
-            | StrOutputParser()
+            RunnableParallel(docs=self.retriever, question=RunnablePassthrough())
+            | RunnablePassthrough.assign(answer=RunnableLambda(_to_answer_input) | self.answer_chain)
         )
 
         return self.qa_chain
 
-    def query(self, question: str) -> dict:
+    def query(
+        self,
+        question: str,
+        query_vector: Optional[List[float]] = None,
+        return_sources: bool = True
+    ) -> dict:
         """
         질문에 답변하기 (LCEL)
+
+        Args:
+            question: 사용자 질문
+            query_vector: 미리 계산한 질문 임베딩 (있으면 재임베딩 없이 벡터로 바로 검색)
+            return_sources: 참조 문서 본문 포함 여부 (답변만 필요하면 False, sources는 빈 리스트)
         """
         if not self.qa_chain:
             raise ValueError("QA 체인이 없습니다. create_qa_chain을 먼저 호출하세요.")
 
-        # LCEL 체인 실행 - 자동으로 문서 검색 + 답변 생성
-        answer = self.qa_chain.invoke(question)
+        if query_vector is not None:
+            # 전달받은 임베딩으로 검색 → 같은 문서로 답변 생성 (임베딩/검색 1회)
+            source_docs = self.vectorstore.similarity_search_by_vector(query_vector, k=RETRIEVER_TOP_K)
+            answer = self.answer_chain.invoke({
+                "context": _format_docs(source_docs),
+                "question": question
+            })
+            return {
+                "answer": answer,
+                "sources": [doc.page_content for doc in source_docs] if return_sources else []
+            }
 
-        # 소스 문서 별도 검색 (참조용)
-        source_docs = self.retriever.invoke(question)
+        # LCEL 체인 실행 - 문서 검색 + 답변 생성 (검색한 문서를 참조 문서로 그대로 반환)
+        result = self.qa_chain.invoke(question)
 
         return {
-            "answer": answer,  # AI 답변
-            "sources": [doc.page_content for doc in source_docs]  # 참조 문서
+            "answer": result["answer"],  # AI 답변
+            "sources": [doc.page_content for doc in result["docs"]] if return_sources else []  # 참조 문서
         }
 
+    async def aquery(
+        self,
+        question: str,
+        query_vector: Optional[List[float]] = None,
+        return_sources: bool = True
+    ) -> dict:
+        """
+        질문에 답변하기 (비동기, 인자는 query와 동일)
+
+        - 임베딩/LLM 호출은 비동기 API 사용
+        - PGVector는 동기 엔진으로 연결되어 있으므로 벡터 검색은 전용 스레드 풀에서 실행
+        """
+        if not self.qa_chain:
+            raise ValueError("QA 체인이 없습니다. create_qa_chain을 먼저 호출하세요.")
+
+        if query_vector is None:
+            query_vector = await self.embeddings.aembed_query(question)
+
+        source_docs = await run_vector_search(
+            self.vectorstore.similarity_search_by_vector, query_vector, k=RETRIEVER_TOP_K
+        )
+        answer = await self.answer_chain.ainvoke({
+            "context": _format_docs(source_docs),
+            "question": question
+        })
+
+        return {
+            "answer": answer,
+            "sources": [doc.page_content for doc in source_docs] if return_sources else []
+        }
+
+    def close(self):
+        """
+        DB 커넥션 풀 정리
+        - 재초기화로 새 인스턴스로 교체될 때 호출
+        - 엔진은 dispose 후에도 필요 시 다시 연결하므로 진행 중인 요청은 영향 없음
+        """
+        engine = getattr(self.vectorstore, "_engine", None) if self.vectorstore else None
+        if engine is not None:
+            engine.dispose()
+
 
 # ============================================
 # 싱글톤 패턴
 # ============================================
 _vector_store_instance: Optional[VectorStoreService] = None
+_vector_store_lock = threading.Lock()
 
 def get_vector_store_service() -> VectorStoreService:
     """
@@ -185,29 +324,55 @@ def get_vector_store_service() -> VectorStoreService:
     global _vector_store_instance
 
     if _vector_store_instance is None:
-        from app.config import get_settings
-        settings = get_settings()
+        with _vector_store_lock:
+            if _vector_store_instance is None:
+                from app.config import get_settings
+                settings = get_settings()
+
+                instance = VectorStoreService(
+                    openai_api_key=settings.openai_api_key,
+                    database_url=settings.database_url
+                )
 
-        _vector_store_instance = VectorStoreService(
-            openai_api_key=settings.openai_api_key,
-            database_url=settings.database_url
-        )
+                # 기존 벡터 DB 자동 로드
+                if instance.load_vectorstore():
+                    instance.create_qa_chain()
+                    print("✅ PDF 매뉴얼 벡터 스토어 로드 완료")
+                else:
+                    print("⚠️  벡터 스토어가 비어있습니다. /api/chatbot/initialize를 호출하여 PDF를 로드하세요.")
 
-        # 기존 벡터 DB 자동 로드
-        if _vector_store_instance.load_vectorstore():
-            _vector_store_instance.create_qa_chain()
-            print("✅ PDF 매뉴얼 벡터 스토어 로드 완료")
-        else:
-            print("⚠️  벡터 스토어가 비어있습니다. /api/chatbot/initialize를 호출하여 PDF를 로드하세요.")
+                _vector_store_instance = instance
 
     return _vector_store_instance
 
+def set_vector_store_service(instance: VectorStoreService):
+    """
+    벡터 스토어 서비스 교체 (재초기화용)
+
+    - /api/chatbot/initialize에서 새로 만든 인스턴스를 등록
+    - 교체는 Lock 안에서 수행하고, 이전 인스턴스의 커넥션 풀은 정리
+    """
+    global _vector_store_instance
+
+    with _vector_store_lock:
+        previous = _vector_store_instance
+        _vector_store_instance = instance
+
+    if previous is not None and previous is not instance:
+        previous.close()
+
 def reset_vector_store_service():
     """
     벡터 스토어 서비스 리셋 (재초기화용)
 
-    - /api/chatbot/initialize에서 사용
+    - 다음 get_vector_store_service 호출 시 다시 로드
     - 테스트에서 사용
     """
     global _vector_store_instance
-    _vector_store_instance = None
+
+    with _vector_store_lock:
+        previous = _vector_store_instance
+        _vector_store_instance = None
+
+    if previous is not None:
+        previous.close()
@@ -0,0 +1,37 @@
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
+import asyncio
+import os
+from app.config import get_settings
+
+
+def _available_cpu_count() -> int:
+    """
+    이 프로세스가 실제로 스케줄될 수 있는 CPU 수
+    - Python 3.13+: os.process_cpu_count(), 이전 버전: CPU affinity(sched_getaffinity) 기준
+    - 호스트 전체 논리 CPU 수(os.cpu_count())보다 정확하지만 cgroup CPU 쿼터(docker --cpus)는 반영하지 않음
+    """
+    if hasattr(os, "process_cpu_count"):
+        return os.process_cpu_count() or 4
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0)) or 4
+    return os.cpu_count() or 4
+
+
+@lru_cache()
+def get_vector_search_executor() -> ThreadPoolExecutor:
+    """
+    pgvector 유사도 검색 전용 스레드 풀 (프로세스 전역 싱글톤)
+    - PGVector/SQLAlchemy 동기 호출이 이벤트 루프를 막지 않도록 분리
+    - 기본 스레드 풀을 다른 작업(Redis I/O 등)과 나눠 쓰지 않도록 전용 풀 사용
+    - 크기: VECTOR_SEARCH_WORKERS 설정값, 없으면 이 프로세스가 쓸 수 있는 CPU 수 (DB 동시 검색 과다 방지)
+      컨테이너 CPU 쿼터는 자동 반영되지 않으므로 쿼터가 있으면 설정값으로 지정
+    """
+    max_workers = get_settings().vector_search_workers or _available_cpu_count()
+    return ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="vector-search")
+
+
+async def run_vector_search(func, *args, **kwargs):
+    """동기 벡터 검색 함수를 전용 스레드 풀에서 실행"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_vector_search_executor(), partial(func, *args, **kwargs))
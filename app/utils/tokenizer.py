@@ -0,0 +1,11 @@
+from functools import lru_cache
+import tiktoken
+
+
+@lru_cache()
+def get_tokenizer() -> tiktoken.Encoding:
+    """
+    토큰 카운터 (gpt-4o-mini는 cl100k_base 인코딩 사용)
+    - 프로세스 전역에서 하나의 인코더를 공유 (BPE 어휘 로드 1회)
+    """
+    return tiktoken.get_encoding("cl100k_base")